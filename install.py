@@ -8,12 +8,25 @@ and executes remote commands via SSH without copying the install script itself.
 """
 
 import argparse
+import concurrent.futures
+import errno
+import fcntl
+import filecmp
+import functools
 import getpass
 import os
+import re
+import shlex
 import shutil
+import stat
+import string
 import subprocess
 import sys
+import tarfile
 import tempfile
+import threading
+import time
+from typing import Any
 
 # Color codes for terminal output
 BLUE = '\033[94m'
@@ -29,22 +42,176 @@ CONFIG_PATH = f"{CONFIG_DIR}/config.toml"
 SERVICE_PATH = "/etc/systemd/system/wg-failover.service"
 LOG_PATH = "/var/log/wg-failover.log"
 
+# Checkout holding this script, Cargo.toml and the release artifacts
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Buffer size for userspace copies (sendfile fallback, tar upload stream)
+COPY_BUFSIZE = 1024 * 1024
+
+# ioctl request for a copy-on-write clone of a whole file, _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# External commands the installer may run, all resolved by the first PATH scan
+INSTALLER_COMMANDS = ('systemctl', 'ssh', 'sftp', 'zstd', 'rsync')
+
+# Ciphers moved to the front of ssh's default list (^, OpenSSH >= 7.9), fastest on AES-NI hardware
+SSH_CIPHERS = "^aes128-gcm@openssh.com,aes256-gcm@openssh.com"
+
+# Seconds to wait for the SSH connection to a remote server
+SSH_CONNECT_TIMEOUT = 10
+
+# Remote servers deployed to at the same time by a multi-target run
+MAX_PARALLEL_DEPLOYS = 8
+
+# Version line printed by `wg-failover --version`, e.g. "wg-failover 0.1.0"
+VERSION_OUTPUT_RE = re.compile(r'^wg-failover\s+(\S+)', re.MULTILINE)
+
+# First `version = "0.1.0"` line of Cargo.toml, i.e. the [package] version
+CARGO_VERSION_RE = re.compile(rb'^\s*version\s*=\s*["\']([^"\']+)', re.MULTILINE)
+
+# systemctl show properties reported after a remote install
+SERVICE_STATUS_PROPERTIES = ('ActiveState', 'SubState', 'MainPID', 'ExecMainStatus')
+
+# Exit status of the upload command when the remote server has no zstd
+REMOTE_ZSTD_MISSING = 125
+
+# Executables located on PATH and every name already looked for, shared by the whole run
+_RESOLVED_BINARIES: dict[str, str] = {}
+_SCANNED_NAMES: set[str] = set()
+# Concurrent remote deploys resolve commands from several threads at once
+_RESOLVE_LOCK = threading.Lock()
+
 def print_color(text: str, color: str) -> None:
     """Print colored text to terminal"""
     print(f"{color}{text}{ENDC}")
 
+def _try_reflink(src_fd: int, dst_fd: int) -> bool:
+    """Clone src_fd into dst_fd with FICLONE, return False if the filesystem can't"""
+    try:
+        _ = fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError as e:
+        if e.errno in (errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS):
+            return False
+        raise
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> int:
+    """Copy up to size bytes with copy_file_range and return how many were copied"""
+    offset = 0
+    try:
+        while offset < size:
+            # No explicit offsets, so both file positions advance with the copy
+            copied = os.copy_file_range(src_fd, dst_fd, size - offset)
+            if copied == 0:
+                break
+            offset += copied
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+            raise
+    return offset
+
+def _sendfile_copy(src_fd: int, dst_fd: int, size: int, offset: int = 0) -> None:
+    """Copy bytes from offset up to size from src_fd to dst_fd in the kernel via sendfile"""
+    try:
+        while offset < size:
+            sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except OSError as e:
+        if e.errno not in (errno.ENOSYS, errno.EINVAL):
+            raise
+        # sendfile not supported for this pair of files, copy the rest in userspace
+        _ = os.lseek(src_fd, offset, os.SEEK_SET)
+        _ = os.lseek(dst_fd, offset, os.SEEK_SET)
+        with open(src_fd, 'rb', closefd=False) as fsrc, open(dst_fd, 'wb', closefd=False) as fdst:
+            shutil.copyfileobj(fsrc, fdst, COPY_BUFSIZE)
+
+def _fastcopy(src: str, dst: str, mode: int | None = None) -> None:
+    """Copy src to dst by reflink or in-kernel copy and set its mode (default: src's)"""
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        src_st = os.fstat(src_fd)
+        if mode is None:
+            mode = stat.S_IMODE(src_st.st_mode)
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        try:
+            # fchmod also covers a pre-existing dst and bits masked by the umask
+            os.fchmod(dst_fd, mode)
+            if not _try_reflink(src_fd, dst_fd):
+                copied = _copy_file_range(src_fd, dst_fd, src_st.st_size)
+                if copied < src_st.st_size:
+                    _sendfile_copy(src_fd, dst_fd, src_st.st_size, copied)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
 def replace_config_with_latest(source_config: str, dest_config: str) -> None:
     """Replace configuration file with latest version"""
+    # Leave an identical config untouched, keeping its mtime for anything watching it
+    try:
+        if filecmp.cmp(source_config, dest_config, shallow=False):
+            print_color("Configuration file already up to date", GREEN)
+            return
+    except OSError:
+        pass
     # Simply copy the new config file
-    shutil.copy(source_config, dest_config)
+    _fastcopy(source_config, dest_config)
     print_color("Configuration file installed", GREEN)
 
+def _resolve_binaries(names: list[str]) -> dict[str, str]:
+    """Locate executables with a single scan of PATH, caching results for the run"""
+    # Held for the whole scan: a name is marked as scanned before it is found,
+    # so another thread must not read the cache until the scan has finished
+    with _RESOLVE_LOCK:
+        wanted = (set(names) | set(INSTALLER_COMMANDS)) - _SCANNED_NAMES
+        _SCANNED_NAMES.update(wanted)
+        for directory in os.environ.get('PATH', os.defpath).split(os.pathsep):
+            if not wanted:
+                break
+            try:
+                with os.scandir(directory or '.') as it:
+                    for entry in it:
+                        if entry.name in wanted and entry.is_file() and os.access(entry.path, os.X_OK):
+                            _RESOLVED_BINARIES[entry.name] = entry.path
+                            wanted.discard(entry.name)
+            except OSError:
+                continue
+        return {name: _RESOLVED_BINARIES[name] for name in names if name in _RESOLVED_BINARIES}
+
+def check_dependencies(required_commands: list[str]) -> None:
+    """Exit with an error if any required command is missing from PATH"""
+    found = _resolve_binaries(required_commands)
+    missing = [cmd for cmd in required_commands if cmd not in found]
+    if missing:
+        print_color(f"Error: Required command(s) not found in PATH: {', '.join(missing)}", RED)
+        sys.exit(1)
+
+def _spawn_args(cmd: list[str]) -> list[str]:
+    """Replace a bare command name with its absolute path from the PATH scan"""
+    executable = cmd[0]
+    if os.sep not in executable:
+        executable = _resolve_binaries([executable]).get(executable, executable)
+    return [executable, *cmd[1:]]
+
+def run_command(cmd: list[str], **kwargs: Any) -> subprocess.CompletedProcess[str]:
+    """Run a local command via CPython's posix_spawn fast path instead of fork+exec"""
+    # posix_spawn is only used for an executable with a directory component and
+    # close_fds=False; fds opened by Python are non-inheritable anyway (PEP 446)
+    return subprocess.run(_spawn_args(cmd), close_fds=False, **kwargs)
+
+def start_command(cmd: list[str], **kwargs: Any) -> subprocess.Popen[bytes]:
+    """Start a local command in the background via the posix_spawn fast path"""
+    return subprocess.Popen(_spawn_args(cmd), close_fds=False, **kwargs)
+
 def check_root() -> None:
     """Check if running as root"""
     if os.geteuid() != 0:
         print_color("Error: This script must be run as root for local installation", RED)
         sys.exit(1)
 
+@functools.lru_cache(maxsize=1)
 def is_installed() -> bool:
     """Check if wg-failover is already installed"""
     return os.path.exists(BINARY_PATH) and os.path.exists(SERVICE_PATH)
@@ -52,65 +219,61 @@ def is_installed() -> bool:
 def is_service_running() -> bool:
     """Check if wg-failover service is running"""
     try:
-        result = subprocess.run(['systemctl', 'is-active', 'wg-failover.service'], 
-                               capture_output=True, text=True)
+        # Only the exit status matters, so the output goes to /dev/null rather than a pipe
+        result = run_command(['systemctl', 'is-active', 'wg-failover.service'],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return result.returncode == 0
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
-def get_installed_version() -> str | None:
-    """Get version of installed wg-failover binary"""
-    if not os.path.exists(BINARY_PATH):
-        return None
-    
+def get_binary_version(binary_path: str) -> str | None:
+    """Get version reported by a wg-failover binary's --version output"""
     try:
-        result = subprocess.run([BINARY_PATH, '--version'], 
-                               capture_output=True, text=True)
-        if result.returncode == 0:
-            # Extract version from output like "wg-failover 0.1.0"
-            for line in result.stdout.splitlines():
-                if 'wg-failover' in line:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        return parts[1]
+        result = run_command([binary_path, '--version'],
+                             capture_output=True, text=True)
     except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
+        return None
+    if result.returncode != 0:
+        return None
     
+    # Extract version from output like "wg-failover 0.1.0"
+    match = VERSION_OUTPUT_RE.search(result.stdout)
+    return match.group(1) if match else None
+
+@functools.lru_cache(maxsize=1)
+def get_installed_version() -> str | None:
+    """Get version of installed wg-failover binary"""
+    # A missing binary makes the --version spawn fail, so no separate exists() check
+    return get_binary_version(BINARY_PATH)
+
+@functools.lru_cache(maxsize=None)
+def find_source_binary(current_dir: str) -> str | None:
+    """Locate the wg-failover executable in target/release/ or current_dir"""
+    for candidate in (os.path.join(current_dir, 'target', 'release', 'wg-failover'),
+                      os.path.join(current_dir, 'wg-failover')):
+        try:
+            if stat.S_ISREG(os.stat(candidate).st_mode):
+                return candidate
+        except OSError:
+            continue
     return None
 
+@functools.lru_cache(maxsize=1)
 def get_current_version() -> str | None:
     """Get version from current directory"""
     # Try to get version from Cargo.toml
-    cargo_toml_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'Cargo.toml')
-    if os.path.exists(cargo_toml_path):
-        try:
-            with open(cargo_toml_path, 'r') as f:
-                for line in f:
-                    if line.strip().startswith('version ='):
-                        # Extract version from: version = "0.1.0"
-                        version = line.split('=')[1].strip().strip('"\'')
-                        return version
-        except Exception:
-            pass
+    try:
+        with open(os.path.join(SCRIPT_DIR, 'Cargo.toml'), 'rb') as f:
+            match = CARGO_VERSION_RE.search(f.read())
+        if match:
+            return match.group(1).decode()
+    except Exception:
+        pass
     
     # Try to get version from built binary
-    current_dir = os.path.dirname(os.path.realpath(__file__))
-    binary_path = os.path.join(current_dir, 'target', 'release', 'wg-failover')
-    if not os.path.exists(binary_path):
-        binary_path = os.path.join(current_dir, 'wg-failover')
-    
-    if os.path.exists(binary_path):
-        try:
-            result = subprocess.run([binary_path, '--version'], 
-                                   capture_output=True, text=True)
-            if result.returncode == 0:
-                for line in result.stdout.splitlines():
-                    if 'wg-failover' in line:
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            return parts[1]
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            pass
+    binary_path = find_source_binary(SCRIPT_DIR)
+    if binary_path:
+        return get_binary_version(binary_path)
     
     return None
 
@@ -119,7 +282,7 @@ def backup_config() -> bool:
     if os.path.exists(CONFIG_PATH):
         backup_path = f"{CONFIG_PATH}.backup"
         try:
-            shutil.copy(CONFIG_PATH, backup_path)
+            _fastcopy(CONFIG_PATH, backup_path)
             print_color(f"Configuration backed up to {backup_path}", GREEN)
             return True
         except Exception as e:
@@ -132,7 +295,7 @@ def restore_config() -> bool:
     backup_path = f"{CONFIG_PATH}.backup"
     if os.path.exists(backup_path):
         try:
-            shutil.copy(backup_path, CONFIG_PATH)
+            _fastcopy(backup_path, CONFIG_PATH)
             print_color(f"Configuration restored from {backup_path}", GREEN)
             return True
         except Exception as e:
@@ -146,29 +309,44 @@ def stop_service() -> bool:
     if was_running:
         print_color("Stopping wg-failover service...", YELLOW)
         try:
-            subprocess.run(['systemctl', 'stop', 'wg-failover.service'], check=True)
+            run_command(['systemctl', 'stop', 'wg-failover.service'], check=True)
             print_color("Service stopped successfully", GREEN)
         except subprocess.CalledProcessError:
             print_color("Warning: Could not stop service via systemctl", YELLOW)
-            # Try to kill the process directly
+            # Signal the processes in the unit's cgroup directly
             try:
-                subprocess.run(['pkill', '-f', 'wg-failover'], capture_output=True)
+                run_command(['systemctl', 'kill', '--signal=SIGTERM', 'wg-failover.service'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
                 print_color("Process terminated", GREEN)
             except Exception:
                 print_color("Warning: Could not terminate process", YELLOW)
     return was_running
 
+def wait_for_service_state(timeout: float = 5.0) -> str:
+    """Wait until wg-failover service leaves a transitional state and return its ActiveState"""
+    deadline = time.monotonic() + timeout
+    # Poll quickly at first, as the unit usually settles within a few tens of ms,
+    # then back off so a slow start does not spawn systemctl ten times a second
+    delay = 0.02
+    while True:
+        result = run_command(['systemctl', 'show', '-p', 'ActiveState', '--value', 'wg-failover.service'],
+                             capture_output=True, text=True)
+        state = result.stdout.strip()
+        remaining = deadline - time.monotonic()
+        if state not in ('activating', 'deactivating', 'reloading') or remaining <= 0:
+            return state
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.25)
+
 def start_service() -> bool:
     """Start wg-failover service"""
     print_color("Starting wg-failover service...", GREEN)
     try:
-        subprocess.run(['systemctl', 'start', 'wg-failover.service'], check=True)
-        # Wait a moment for service to start
-        import time
-        time.sleep(2)
+        # systemctl start blocks until the start job has finished
+        run_command(['systemctl', 'start', 'wg-failover.service'], check=True)
         
         # Verify service is running
-        if is_service_running():
+        if wait_for_service_state() == 'active':
             print_color("Service started successfully", GREEN)
             return True
         else:
@@ -182,52 +360,51 @@ def enable_service() -> bool:
     """Enable wg-failover service to start on boot"""
     print_color("Enabling wg-failover service to start on boot...", GREEN)
     try:
-        subprocess.run(['systemctl', 'enable', 'wg-failover.service'], check=True)
+        run_command(['systemctl', 'enable', 'wg-failover.service'], check=True)
         print_color("Service enabled successfully", GREEN)
         return True
     except subprocess.CalledProcessError as e:
         print_color(f"Warning: Could not enable service: {e}", YELLOW)
         return False
 
-def disable_service() -> bool:
-    """Disable wg-failover service from starting on boot"""
+def disable_service(now: bool = False) -> bool:
+    """Disable wg-failover service from starting on boot, also stopping it if now is set"""
     print_color("Disabling wg-failover service from starting on boot...", YELLOW)
     try:
-        subprocess.run(['systemctl', 'disable', 'wg-failover.service'], check=True)
+        run_command(['systemctl', 'disable', *(['--now'] if now else []), 'wg-failover.service'], check=True)
         print_color("Service disabled successfully", GREEN)
         return True
     except subprocess.CalledProcessError as e:
         print_color(f"Warning: Could not disable service: {e}", YELLOW)
         return False
 
+def remove_file(path: str, label: str) -> bool:
+    """Remove path if present and report it, returning whether a file was removed"""
+    # A single unlink: no exists() check beforehand, and no race with it
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        print_color(f"Warning: Could not remove {label}: {e}", YELLOW)
+        return False
+    print_color(f"✓ Removed {label}: {path}", GREEN)
+    return True
+
 def cleanup_installation() -> bool:
     """Stop service, disable it, and remove binary and service file (preserve config and logs)"""
     print_color("=== Cleaning up WireGuard Failover installation ===", BLUE)
     
-    # Stop the service if running
-    _ = stop_service()
+    # Stop and disable the service in one call, signalling it directly if that fails
+    if not disable_service(now=True):
+        _ = stop_service()
     
-    # Disable the service
-    _ = disable_service()
-    
-    # Remove service file
+    # Remove service file and binary
     removed_items = []
-    try:
-        if os.path.exists(SERVICE_PATH):
-            os.remove(SERVICE_PATH)
-            removed_items.append("service file")
-            print_color(f"✓ Removed service file: {SERVICE_PATH}", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not remove service file: {e}", YELLOW)
-    
-    # Remove binary
-    try:
-        if os.path.exists(BINARY_PATH):
-            os.remove(BINARY_PATH)
-            removed_items.append("binary")
-            print_color(f"✓ Removed binary: {BINARY_PATH}", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not remove binary: {e}", YELLOW)
+    if remove_file(SERVICE_PATH, "service file"):
+        removed_items.append("service file")
+    if remove_file(BINARY_PATH, "binary"):
+        removed_items.append("binary")
     
     # Note: Config directory and log file are preserved for future installations
     if os.path.exists(CONFIG_PATH):
@@ -238,7 +415,7 @@ def cleanup_installation() -> bool:
     # Reload systemd daemon if service file was removed
     if "service file" in removed_items:
         try:
-            subprocess.run(['systemctl', 'daemon-reload'], check=True)
+            run_command(['systemctl', 'daemon-reload'], check=True)
             print_color("✓ Systemd daemon reloaded", GREEN)
         except Exception as e:
             print_color(f"Warning: Could not reload systemd daemon: {e}", YELLOW)
@@ -251,137 +428,128 @@ def cleanup_installation() -> bool:
     
     return len(removed_items) > 0
 
+def is_up_to_date(src: str, dst: str, mode: int) -> bool:
+    """Check whether dst already has src's contents and the given mode"""
+    try:
+        if stat.S_IMODE(os.stat(dst).st_mode) != mode:
+            return False
+        # Compares sizes first, then the bytes, stopping at the first difference
+        return filecmp.cmp(src, dst, shallow=False)
+    except OSError:
+        return False
+
+def install_files(items: list[tuple[str, str, int]]) -> None:
+    """Copy each (source, destination, mode) item into place"""
+    # No hardlinks: the installed config is edited in place and the modes are
+    # set on the inode, so a link would change the files in the checkout too.
+    # _fastcopy already clones the extents on reflink-capable filesystems.
+    for src, dst, mode in items:
+        print_color(f"Installing {os.path.basename(src)} to {dst}...", GREEN)
+        # Write next to dst and rename over it, so dst is never seen half-written
+        tmp_dst = f"{dst}.new"
+        try:
+            _fastcopy(src, tmp_dst, mode)
+            os.replace(tmp_dst, dst)
+        except BaseException:
+            # Don't leave a partial copy behind in the system directories
+            try:
+                os.unlink(tmp_dst)
+            except FileNotFoundError:
+                pass
+            raise
+        print_color(f"✓ Installed {dst}", GREEN)
+
 def local_install(current_dir: str, is_update: bool) -> None:
     """Perform local installation or update"""
     print_color("=== Installing WireGuard Failover Locally ===", GREEN)
+    # main() has already checked for root, so systemctl is run directly: a sudo
+    # wrapper would add a process and a PAM session to every call
+    check_dependencies(['systemctl'])
     
-    # Step 1: Execute cleanup commands on target system
-    print_color("Stopping wg-failover service...", YELLOW)
-    try:
-        subprocess.run(['sudo', 'systemctl', 'stop', 'wg-failover.service'], check=True)
-        print_color("✓ Service stopped successfully", GREEN)
-    except subprocess.CalledProcessError:
-        print_color("Warning: Could not stop service (may not be installed)", YELLOW)
-    
-    print_color("Disabling wg-failover service...", YELLOW)
-    try:
-        subprocess.run(['sudo', 'systemctl', 'disable', 'wg-failover.service'], check=True)
-        print_color("✓ Service disabled successfully", GREEN)
-    except subprocess.CalledProcessError:
-        print_color("Warning: Could not disable service (may not be installed)", YELLOW)
-    
-    print_color("Removing log file...", YELLOW)
-    try:
-        if os.path.exists(LOG_PATH):
-            os.remove(LOG_PATH)
-            print_color(f"✓ Removed log file: {LOG_PATH}", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not remove log file: {e}", YELLOW)
-    
-    print_color("Removing binary...", YELLOW)
-    try:
-        if os.path.exists(BINARY_PATH):
-            os.remove(BINARY_PATH)
-            print_color(f"✓ Removed binary: {BINARY_PATH}", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not remove binary: {e}", YELLOW)
-    
-    print_color("Removing configuration...", YELLOW)
-    try:
-        if os.path.exists(CONFIG_PATH):
-            os.remove(CONFIG_PATH)
-            print_color(f"✓ Removed configuration: {CONFIG_PATH}", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not remove configuration: {e}", YELLOW)
-    
-    print_color("Removing service file...", YELLOW)
-    try:
-        if os.path.exists(SERVICE_PATH):
-            os.remove(SERVICE_PATH)
-            print_color(f"✓ Removed service file: {SERVICE_PATH}", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not remove service file: {e}", YELLOW)
-    
-    # Reload systemd daemon
-    try:
-        subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
-        print_color("✓ Systemd daemon reloaded", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not reload systemd daemon: {e}", YELLOW)
-    
-    # Step 2: Copy files from current directory to target system
-    print_color("Copying files to target system...", GREEN)
-    
-    # Copy config file
-    config_src = os.path.join(current_dir, 'config.toml')
-    if os.path.exists(config_src):
-        print_color(f"Installing configuration to {CONFIG_PATH}...", GREEN)
-        os.makedirs(CONFIG_DIR, mode=0o755, exist_ok=True)
-        _ = shutil.copy(config_src, CONFIG_PATH)
-        os.chmod(CONFIG_PATH, 0o644)
-        print_color("✓ Configuration installed successfully", GREEN)
-    else:
+    # Locate source files before touching the existing installation
+    config_src: str | None = os.path.join(current_dir, 'config.toml')
+    if not os.path.exists(config_src):
         print_color(f"Warning: config.toml file not found in {current_dir}", YELLOW)
+        config_src = None
     
-    # Copy service file
     service_src = os.path.join(current_dir, 'wg-failover.service')
-    if os.path.exists(service_src):
-        print_color(f"Installing systemd service to {SERVICE_PATH}...", GREEN)
-        _ = shutil.copy(service_src, SERVICE_PATH)
-        os.chmod(SERVICE_PATH, 0o644)
-        print_color("✓ Service file installed successfully", GREEN)
-    else:
+    if not os.path.exists(service_src):
         print_color(f"Error: wg-failover.service file not found in {current_dir}", RED)
         sys.exit(1)
     
-    # Copy binary
-    binary_src = os.path.join(current_dir, 'target', 'release', 'wg-failover')
-    if not os.path.exists(binary_src):
-        binary_src = os.path.join(current_dir, 'wg-failover')
-    
-    if os.path.exists(binary_src):
-        print_color(f"Installing binary to {BINARY_PATH}...", GREEN)
-        _ = shutil.copy(binary_src, BINARY_PATH)
-        os.chmod(BINARY_PATH, 0o755)
-        print_color("✓ Binary installed successfully", GREEN)
-    else:
+    binary_src = find_source_binary(current_dir)
+    if not binary_src:
         print_color(f"Error: wg-failover executable not found in {current_dir}/target/release/ or {current_dir}/", RED)
         sys.exit(1)
     
+    install_items: list[tuple[str, str, int]] = []
+    if config_src is not None:
+        install_items.append((config_src, CONFIG_PATH, 0o644))
+    install_items.append((service_src, SERVICE_PATH, 0o644))
+    install_items.append((binary_src, BINARY_PATH, 0o755))
+    
+    # Files already installed with identical contents and mode are left alone,
+    # and systemd only needs a reload when the unit file changes
+    unchanged = {dst for src, dst, mode in install_items if is_up_to_date(src, dst, mode)}
+    for dst in sorted(unchanged):
+        print_color(f"✓ {dst} is up to date", GREEN)
+    service_changed = SERVICE_PATH not in unchanged
+    
+    # Step 1: Execute cleanup commands on target system
+    print_color("Stopping and disabling wg-failover service...", YELLOW)
+    try:
+        run_command(['systemctl', 'disable', '--now', 'wg-failover.service'], check=True)
+        print_color("✓ Service stopped and disabled successfully", GREEN)
+    except subprocess.CalledProcessError:
+        print_color("Warning: Could not stop and disable service (may not be installed)", YELLOW)
+    
+    # Files that are about to be reinstalled stay in place so install_files can
+    # swap them with a single rename; only stale leftovers are removed here
+    install_dsts = {dst for _, dst, _ in install_items}
+    for label, path in (('log file', LOG_PATH), ('binary', BINARY_PATH),
+                        ('configuration', CONFIG_PATH), ('service file', SERVICE_PATH)):
+        if path in install_dsts:
+            continue
+        print_color(f"Removing {label}...", YELLOW)
+        _ = remove_file(path, label)
+    
+    # Step 2: Copy files from current directory to target system in one pass
+    print_color("Copying files to target system...", GREEN)
+    if config_src is not None:
+        os.makedirs(CONFIG_DIR, mode=0o755, exist_ok=True)
+    install_files([item for item in install_items if item[1] not in unchanged])
+    
     # Setup logging
     print_color("Setting up logging...", GREEN)
     try:
-        with open(LOG_PATH, 'a'):
-            pass
-        os.chmod(LOG_PATH, 0o640)
+        # Refuse to follow a symlink planted at the log path; fchmod covers a
+        # pre-existing file and bits masked by the umask
+        fd = os.open(LOG_PATH, os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o640)
+        try:
+            os.fchmod(fd, 0o640)
+        finally:
+            os.close(fd)
         print_color(f"Log file created at {LOG_PATH}", GREEN)
     except Exception as e:
         print_color(f"Warning: Could not create log file: {e}", YELLOW)
     
     # Reload systemd daemon after copying service file
-    try:
-        subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
-        print_color("✓ Systemd daemon reloaded", GREEN)
-    except Exception as e:
-        print_color(f"Warning: Could not reload systemd daemon: {e}", YELLOW)
+    if service_changed:
+        try:
+            run_command(['systemctl', 'daemon-reload'], check=True)
+            print_color("✓ Systemd daemon reloaded", GREEN)
+        except Exception as e:
+            print_color(f"Warning: Could not reload systemd daemon: {e}", YELLOW)
     
     # Step 3: Enable and start service
-    print_color("Enabling wg-failover service...", GREEN)
+    print_color("Enabling and starting wg-failover service...", GREEN)
     try:
-        subprocess.run(['sudo', 'systemctl', 'enable', 'wg-failover.service'], check=True)
-        print_color("✓ Service enabled successfully", GREEN)
+        run_command(['systemctl', 'enable', '--now', 'wg-failover.service'], check=True)
+        print_color("✓ Service enabled and started successfully", GREEN)
     except subprocess.CalledProcessError as e:
         print_color(f"Error enabling service: {e}", RED)
         sys.exit(1)
     
-    print_color("Starting wg-failover service...", GREEN)
-    try:
-        subprocess.run(['sudo', 'systemctl', 'start', 'wg-failover.service'], check=True)
-        print_color("✓ Service started successfully", GREEN)
-    except subprocess.CalledProcessError as e:
-        print_color(f"Error starting service: {e}", RED)
-        sys.exit(1)
-    
     print()
     print_color("=== Installation Complete ===", GREEN)
     print_color("Service commands:", YELLOW)
@@ -398,92 +566,15 @@ def local_install(current_dir: str, is_update: bool) -> None:
     print_color(f"Configuration file location: {CONFIG_PATH}", GREEN)
     print_color("Please edit the configuration file to match your setup!", YELLOW)
 
-def remote_install(target_ip: str, private_key: str, username: str, sudo_password: str, is_update: bool) -> None:
-    """Perform remote installation or update via SSH without copying install script"""
-    if is_update:
-        print_color("=== Updating WireGuard Failover Remotely on {} ===".format(target_ip), BLUE)
-    else:
-        print_color("=== Installing WireGuard Failover Remotely on {} ===".format(target_ip), GREEN)
-    
-    # Create SSH command prefix
-    ssh_cmd: list[str] = ["ssh", "-i", private_key, f"{username}@{target_ip}"]
-    ssh_cmd_tty: list[str] = ["ssh", "-t", "-i", private_key, f"{username}@{target_ip}"]  # For commands requiring TTY
-    scp_cmd: list[str] = ["scp", "-i", private_key]
-    
-    # Check if we can connect
-    print_color("Testing SSH connection...", GREEN)
-    try:
-        _ = subprocess.run(ssh_cmd + ['echo', 'Connected successfully'], check=True, capture_output=True)
-        print_color("SSH connection successful", GREEN)
-    except subprocess.CalledProcessError:
-        print_color(f"Error: Could not connect to {target_ip} via SSH", RED)
-        sys.exit(1)
-    
-    # Get current directory
-    current_dir = os.path.dirname(os.path.realpath(__file__))
-    
-    # Check if required files exist
-    required_files = ['wg-failover.service', 'config.toml']
-    for file in required_files:
-        if not os.path.exists(os.path.join(current_dir, file)):
-            print_color(f"Error: Required file '{file}' not found in {current_dir}", RED)
-            sys.exit(1)
-    
-    # Check for wg-failover executable in the correct location
-    wg_failover_exe = os.path.join(current_dir, 'target', 'release', 'wg-failover')
-    if not os.path.exists(wg_failover_exe):
-        wg_failover_exe = os.path.join(current_dir, 'wg-failover')
-    
-    if not os.path.exists(wg_failover_exe):
-        print_color(f"Error: wg-failover executable not found in {current_dir}/target/release/ or {current_dir}/", RED)
-        sys.exit(1)
-    
-    # Create temp directory on remote server
-    print_color("Creating temporary directory on remote server...", GREEN)
-    remote_temp_dir = "/tmp/wg-failover-install"
-    
-    try:
-        _ = subprocess.run(ssh_cmd + ['mkdir', '-p', remote_temp_dir], check=True)
-    except subprocess.CalledProcessError:
-        print_color(f"Error: Could not create directory {remote_temp_dir} on remote server", RED)
-        sys.exit(1)
-    
-    # Copy files to remote server (only assets, not install script)
-    print_color("Copying assets to remote server...", GREEN)
-    
-    # Copy wg-failover executable
-    try:
-        _ = subprocess.run(scp_cmd + [wg_failover_exe, f"{username}@{target_ip}:{remote_temp_dir}/wg-failover"], check=True)
-        print_color("✓ Binary copied", GREEN)
-    except subprocess.CalledProcessError:
-        print_color("Error: Failed to copy binary to remote server", RED)
-        sys.exit(1)
-    
-    # Copy service file
-    service_file = os.path.join(current_dir, 'wg-failover.service')
-    try:
-        _ = subprocess.run(scp_cmd + [service_file, f"{username}@{target_ip}:{remote_temp_dir}/wg-failover.service"], check=True)
-        print_color("✓ Service file copied", GREEN)
-    except subprocess.CalledProcessError:
-        print_color("Error: Failed to copy service file to remote server", RED)
-        sys.exit(1)
-    
-    # Copy config file
-    config_file = os.path.join(current_dir, 'config.toml')
-    try:
-        _ = subprocess.run(scp_cmd + [config_file, f"{username}@{target_ip}:{remote_temp_dir}/config.toml"], check=True)
-        print_color("✓ Config file copied", GREEN)
-    except subprocess.CalledProcessError:
-        print_color("Error: Failed to copy config file to remote server", RED)
-        sys.exit(1)
-    
-    # Create remote installation script (executed on remote server)
-    # Note: We need to pass is_update as a parameter to the shell script
-    update_flag = "true" if is_update else "false"
-    install_script_content = f'''#!/bin/bash
+class _ScriptTemplate(string.Template):
+    """string.Template using @name placeholders, leaving bash's $VAR syntax alone"""
+    delimiter = '@'
+
+# Installation script executed on the remote server, filled in per target
+REMOTE_INSTALL_TEMPLATE = _ScriptTemplate('''#!/bin/bash
 set -e
 
-IS_UPDATE={update_flag}
+IS_UPDATE=@is_update
 
 if [ "$IS_UPDATE" = "true" ]; then
     echo "Starting WireGuard Failover update..."
@@ -498,11 +589,11 @@ if [ "$EUID" -ne 0 ]; then
 fi
 
 # Define paths
-BINARY_SRC="{remote_temp_dir}/wg-failover"
+BINARY_SRC="@temp_dir/wg-failover"
 BINARY_DEST="/usr/local/bin/wg-failover"
-SERVICE_SRC="{remote_temp_dir}/wg-failover.service"
+SERVICE_SRC="@temp_dir/wg-failover.service"
 SERVICE_DEST="/etc/systemd/system/wg-failover.service"
-CONFIG_SRC="{remote_temp_dir}/config.toml"
+CONFIG_SRC="@temp_dir/config.toml"
 CONFIG_DEST="/etc/wg-failover/config.toml"
 CONFIG_DIR="/etc/wg-failover"
 LOG_FILE="/var/log/wg-failover.log"
@@ -511,7 +602,7 @@ LOG_FILE="/var/log/wg-failover.log"
 if systemctl is-active wg-failover.service >/dev/null 2>&1; then
     echo "Stopping wg-failover service..."
     systemctl stop wg-failover.service || true
-    pkill -f wg-failover 2>/dev/null || true
+    systemctl kill --signal=SIGTERM wg-failover.service 2>/dev/null || true
     SERVICE_WAS_RUNNING=true
 else
     SERVICE_WAS_RUNNING=false
@@ -521,40 +612,35 @@ fi
 echo "Disabling wg-failover service..."
 systemctl disable wg-failover.service 2>/dev/null || true
 
-# Remove existing binary if it exists
-echo "Removing existing binary..."
-rm -f "$BINARY_DEST" 2>/dev/null || true
-
 # Remove existing service file if it exists  
 echo "Removing existing service file..."
 rm -f "$SERVICE_DEST" 2>/dev/null || true
 
-# Reload systemd daemon after removing service file
-echo "Reloading systemd daemon..."
-systemctl daemon-reload 2>/dev/null || true
-
 # Backup existing config if updating
 if [ -f "$CONFIG_DEST" ] && [ "$IS_UPDATE" = "true" ]; then
     echo "Backing up existing configuration..."
     cp "$CONFIG_DEST" "$CONFIG_DEST.backup" 2>/dev/null || true
 fi
 
-# Install binary
+# Install binary; the old one stays in place until mv swaps it in one rename
 echo "Installing binary to $BINARY_DEST..."
-cp "$BINARY_SRC" "$BINARY_DEST"
-chmod 755 "$BINARY_DEST"
+install -m 755 "$BINARY_SRC" "$BINARY_DEST.new"
+mv -f "$BINARY_DEST.new" "$BINARY_DEST"
 
 # Install service file
 echo "Installing systemd service..."
-cp "$SERVICE_SRC" "$SERVICE_DEST"
-chmod 644 "$SERVICE_DEST"
+install -m 644 "$SERVICE_SRC" "$SERVICE_DEST"
 systemctl daemon-reload
 
 # Install configuration
 echo "Installing configuration..."
-mkdir -p "$CONFIG_DIR"
+install -d -m 755 "$CONFIG_DIR"
 if [ -f "$CONFIG_SRC" ]; then
-    if [ -f "$CONFIG_DEST" ] && [ "$IS_UPDATE" = "true" ]; then
+    if [ -f "$CONFIG_DEST" ] && cmp -s "$CONFIG_SRC" "$CONFIG_DEST"; then
+        # Leave an identical config untouched, keeping its mtime
+        echo "Configuration is already up to date"
+        chmod 644 "$CONFIG_DEST"
+    elif [ -f "$CONFIG_DEST" ] && [ "$IS_UPDATE" = "true" ]; then
         # Preserve existing config sections
         echo "Preserving existing configuration settings..."
         # Simple config preservation - in production you might want more sophisticated merging
@@ -562,11 +648,10 @@ if [ -f "$CONFIG_SRC" ]; then
             # For now, just keep the backup
             echo "Existing configuration backed up to $CONFIG_DEST.backup"
         fi
-        cp "$CONFIG_SRC" "$CONFIG_DEST"
+        install -m 644 "$CONFIG_SRC" "$CONFIG_DEST"
     else
-        cp "$CONFIG_SRC" "$CONFIG_DEST"
+        install -m 644 "$CONFIG_SRC" "$CONFIG_DEST"
     fi
-    chmod 644 "$CONFIG_DEST"
 else
     echo "Warning: No configuration file found"
 fi
@@ -576,146 +661,314 @@ echo "Setting up logging..."
 touch "$LOG_FILE"
 chmod 640 "$LOG_FILE"
 
-# Set directory permissions
-chmod 755 "$CONFIG_DIR"
+# Enable service for automatic startup
+echo "Enabling service to start on boot..."
+systemctl enable wg-failover.service 2>/dev/null || true
 
 # Start service if it was running or if this is a new installation
 if [ "$SERVICE_WAS_RUNNING" = true ] || [ "$IS_UPDATE" = "false" ]; then
     echo "Starting wg-failover service..."
-    systemctl start wg-failover.service || true
-    sleep 2
+    systemctl reset-failed wg-failover.service 2>/dev/null || true
+    # systemctl start blocks until the start job is done, so there is nothing to sleep on
+    if ! systemctl start wg-failover.service || ! systemctl is-active --quiet wg-failover.service; then
+        echo "Error: wg-failover service failed to start" >&2
+        journalctl -u wg-failover.service -n 50 --no-pager >&2 || true
+        exit 1
+    fi
 fi
 
-# Enable service for automatic startup
-echo "Enabling service to start on boot..."
-systemctl enable wg-failover.service 2>/dev/null || true
-
 # Verify installation
-if systemctl is-active wg-failover.service >/dev/null 2>&1; then
+if systemctl is-active --quiet wg-failover.service; then
     echo "✅ WireGuard Failover service is running"
 else
     echo "⚠️  Service is not running. Check logs with: journalctl -u wg-failover.service"
 fi
 
 echo "Cleaning up temporary files..."
-rm -rf "{remote_temp_dir}"
+rm -rf "@temp_dir"
 
 if [ "$IS_UPDATE" = "true" ]; then
     echo "✅ WireGuard Failover updated successfully!"
 else
     echo "✅ WireGuard Failover installed successfully!"
 fi
-'''
-    
-    # Write the remote installation script to a temporary file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.sh', delete=False) as f:
-        f.write(install_script_content)
-        remote_script_path = f.name
-    
-    # Make the script executable and copy it to remote server
-    os.chmod(remote_script_path, 0o755)
-    
+''')
+
+def render_remote_install_script(remote_temp_dir: str, is_update: bool) -> str:
+    """Generate the installation script executed on the remote server"""
+    return REMOTE_INSTALL_TEMPLATE.substitute(temp_dir=remote_temp_dir,
+                                              is_update="true" if is_update else "false")
+
+def upload_tar(ssh_cmd: list[str], remote_dir: str, files: list[tuple[str, str]],
+               compress: bool = False, stderr: Any = None) -> int:
+    """Create remote_dir and stream files into it as one tar archive"""
+    extract = f"mkdir -p {remote_dir} && tar xf - -C {remote_dir}"
+    if compress:
+        extract = (f"command -v zstd >/dev/null || exit {REMOTE_ZSTD_MISSING}; "
+                   f"mkdir -p {remote_dir} && zstd -dq | tar xf - -C {remote_dir}")
+    upload = start_command(ssh_cmd + [extract], stdin=subprocess.PIPE, stderr=stderr)
+    assert upload.stdin is not None
+    stream = upload.stdin
+    compressor = None
+    if compress:
+        # The binary dominates the transfer and compresses well; zstd costs far
+        # less CPU per byte saved than ssh's zlib compression
+        compressor = start_command([_RESOLVED_BINARIES['zstd'], '-3', '-T0', '-q'],
+                                   stdin=subprocess.PIPE, stdout=upload.stdin)
+        assert compressor.stdin is not None
+        upload.stdin.close()
+        stream = compressor.stdin
     try:
-        _ = subprocess.run(scp_cmd + [remote_script_path, f"{username}@{target_ip}:{remote_temp_dir}/remote_install.sh"], check=True)
-        print_color("✓ Installation script prepared", GREEN)
-    except subprocess.CalledProcessError:
-        print_color("Error: Failed to copy installation script to remote server", RED)
-        os.unlink(remote_script_path)
-        sys.exit(1)
-    
-    # Clean up local temporary file
-    os.unlink(remote_script_path)
-    
-    # Execute remote installation with sudo
-    print_color("Executing remote installation...", GREEN)
-    
-    # Create a wrapper script that runs the installation with sudo
-    sudo_wrapper_content = f'''#!/bin/bash
-echo "{sudo_password}" | sudo -S bash "{remote_temp_dir}/remote_install.sh"
-'''
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.sh', delete=False) as f:
-        f.write(sudo_wrapper_content)
-        sudo_wrapper_path = f.name
-    
-    os.chmod(sudo_wrapper_path, 0o755)
-    
+        # Write the stream in large blocks; the default 10 KiB records mean
+        # roughly a thousand pipe writes per MB of binary
+        # dereference: a symlinked asset must arrive as the file it points to, like
+        # scp and sftp put deliver it, not as a link to a path on this machine
+        with tarfile.open(fileobj=stream, mode='w|', bufsize=COPY_BUFSIZE,
+                          copybufsize=COPY_BUFSIZE, dereference=True) as tar:
+            for local_path, name in files:
+                tar.add(local_path, arcname=name)
+        stream.close()
+    except (BrokenPipeError, ConnectionResetError):
+        # Remote tar exited early; its exit status is reported below
+        pass
+    if compressor is not None:
+        _ = compressor.wait()
+    return upload.wait()
+
+def upload_rsync(ssh_opts: list[str], host: str, remote_dir: str, local_path: str, basis_dir: str) -> bool:
+    """Copy local_path into remote_dir with rsync, using the same-named file in basis_dir as delta basis"""
+    remote_shell = shlex.join(_spawn_args(["ssh", *ssh_opts]))
     try:
-        _ = subprocess.run(scp_cmd + [sudo_wrapper_path, f"{username}@{target_ip}:{remote_temp_dir}/run_with_sudo.sh"], check=True)
-    except subprocess.CalledProcessError:
-        print_color("Error: Failed to copy sudo wrapper to remote server", RED)
-        os.unlink(sudo_wrapper_path)
-        sys.exit(1)
+        result = run_command(["rsync", "-q", "-z", "-p", f"--copy-dest={basis_dir}", "-e", remote_shell,
+                              local_path, f"{host}:{remote_dir}/"],
+                             stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        return False
+    return result.returncode == 0
+
+def _sftp_quote(path: str) -> str:
+    """Quote a path for an sftp batch command"""
+    return '"' + path.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def upload_sftp(sftp_cmd: list[str], host: str, remote_dir: str, files: list[tuple[str, str]],
+                stderr: Any = None) -> bool:
+    """Copy files into remote_dir with one batched sftp session"""
+    # One channel for every file; sftp pipelines the writes of each put
+    batch = [f"-mkdir {_sftp_quote(remote_dir)}"]
+    batch += [f"put -p {_sftp_quote(local_path)} {_sftp_quote(f'{remote_dir}/{name}')}"
+              for local_path, name in files]
+    try:
+        result = run_command(sftp_cmd + ["-b", "-", host], input="\n".join(batch) + "\n",
+                             stdout=subprocess.DEVNULL, stderr=stderr, text=True)
+    except FileNotFoundError:
+        return False
+    return result.returncode == 0
+
+def _print_host_output(prefix: str, text: str) -> None:
+    """Print captured command output with every line labelled by its host"""
+    for line in text.splitlines():
+        print(f"{prefix}{line}")
+
+def remote_install(target_ip: str, private_key: str, username: str, sudo_password: str, is_update: bool,
+                   batch_mode: bool = False) -> None:
+    """Perform remote installation or update via SSH without copying install script"""
+    # Errors and captured output carry the host, so a concurrent deploy's
+    # interleaved output still says which server it came from
+    prefix = f"[{target_ip}] "
+    if is_update:
+        print_color("=== Updating WireGuard Failover Remotely on {} ===".format(target_ip), BLUE)
+    else:
+        print_color("=== Installing WireGuard Failover Remotely on {} ===".format(target_ip), GREEN)
+    check_dependencies(['ssh'])
+    
+    # Share a single SSH connection (ControlMaster) between all ssh/sftp invocations
+    control_dir = tempfile.mkdtemp(prefix='wg-failover-ssh-')
+    ssh_opts: list[str] = ["-i", private_key,
+                           "-o", "ControlMaster=auto",
+                           "-o", f"ControlPath={control_dir}/%C",
+                           "-o", "ControlPersist=60s",
+                           # Favour AES-GCM (AES-NI) for the bulk upload while keeping
+                           # the rest of the default cipher list as fallbacks; the tar
+                           # stream is already zstd-compressed when possible
+                           "-o", f"Ciphers={SSH_CIPHERS}",
+                           "-o", "Compression=no",
+                           "-o", "IPQoS=throughput"]
     
-    os.unlink(sudo_wrapper_path)
+    # Create SSH command prefix
+    host = f"{username}@{target_ip}"
+    ssh_cmd: list[str] = ["ssh", *ssh_opts, host]
+    sftp_cmd: list[str] = ["sftp", *ssh_opts]  # Fallback when the remote server has no tar
     
-    # Run the installation
-    remote_cmd = f"bash {remote_temp_dir}/run_with_sudo.sh"
-    result = subprocess.run(ssh_cmd_tty + [remote_cmd], capture_output=True, text=True)
+    # Check if we can connect by starting the master connection. ssh backgrounds
+    # itself once authenticated, so the handshake overlaps the local checks below.
+    print_color("Testing SSH connection...", GREEN)
+    master_opts = ["-o", f"ConnectTimeout={SSH_CONNECT_TIMEOUT}"]
+    if batch_mode or not sys.stdin.isatty():
+        # Nobody can answer a passphrase or host key prompt (or, in a concurrent
+        # deploy, tell whose prompt it is), so fail instead of hanging
+        master_opts += ["-o", "BatchMode=yes"]
+    # stderr of the ssh, tar and sftp sessions is kept and shown, labelled, on
+    # failure; append mode because the backgrounded master keeps writing to it
+    ssh_log = tempfile.TemporaryFile(mode='a+')
+    master = start_command(["ssh", "-M", "-N", "-f", *master_opts, *ssh_opts, host],
+                           stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=ssh_log)
     
-    # Output results
-    if result.returncode == 0:
-        if is_update:
-            print_color("✅ Remote update completed successfully", BLUE)
+    try:
+        current_dir = SCRIPT_DIR
+        
+        # Check if required files exist
+        required_files = ['wg-failover.service', 'config.toml']
+        for file in required_files:
+            if not os.path.exists(os.path.join(current_dir, file)):
+                print_color(f"{prefix}Error: Required file '{file}' not found in {current_dir}", RED)
+                sys.exit(1)
+        
+        # Check for wg-failover executable in the correct location
+        wg_failover_exe = find_source_binary(current_dir)
+        if not wg_failover_exe:
+            print_color(f"{prefix}Error: wg-failover executable not found in {current_dir}/target/release/ or {current_dir}/", RED)
+            sys.exit(1)
+        
+        if master.wait() != 0:
+            print_color(f"{prefix}Error: Could not connect via SSH", RED)
+            _ = ssh_log.seek(0)
+            _print_host_output(prefix, ssh_log.read())
+            sys.exit(1)
+        print_color("SSH connection successful", GREEN)
+        
+        remote_temp_dir = "/tmp/wg-failover-install"
+        
+        # Create the temp directory and copy the assets in a single tar stream
+        print_color("Copying assets to remote server...", GREEN)
+        assets = [
+            (os.path.join(current_dir, 'wg-failover.service'), 'wg-failover.service'),
+            (os.path.join(current_dir, 'config.toml'), 'config.toml'),
+        ]
+        # On an update the installed binary is a good delta basis, so let rsync
+        # send just the changed blocks when both machines have it; a fresh
+        # install has nothing to diff against and uses the tar stream
+        if not (is_update and 'rsync' in _resolve_binaries(['rsync']) and
+                upload_rsync(ssh_opts, host, remote_temp_dir, wg_failover_exe, os.path.dirname(BINARY_PATH))):
+            assets.insert(0, (wg_failover_exe, 'wg-failover'))
+        compress = 'zstd' in _resolve_binaries(['zstd'])
+        status = upload_tar(ssh_cmd, remote_temp_dir, assets, compress, stderr=ssh_log)
+        if status == REMOTE_ZSTD_MISSING:
+            print_color("zstd not available on remote server, sending files uncompressed...", YELLOW)
+            status = upload_tar(ssh_cmd, remote_temp_dir, assets, stderr=ssh_log)
+        if status == 127:
+            # tar is missing on the remote server
+            print_color("tar not available on remote server, copying files with sftp...", YELLOW)
+            uploaded = upload_sftp(sftp_cmd, host, remote_temp_dir, assets, stderr=ssh_log)
         else:
-            print_color("✅ Remote installation completed successfully!", GREEN)
-        print(result.stdout)
-    else:
-        if is_update:
-            print_color("❌ Error during remote update", RED)
+            uploaded = status == 0
+        if uploaded:
+            print_color("✓ Binary, service file and config file copied", GREEN)
         else:
-            print_color("❌ Error during remote installation", RED)
-        print(result.stderr)
+            print_color(f"{prefix}Error: Failed to copy assets to {remote_temp_dir} on remote server", RED)
+            _ = ssh_log.seek(0)
+            _print_host_output(prefix, ssh_log.read())
+            sys.exit(1)
         
-        # Try to get more info
-        print_color("Attempting to get more details...", YELLOW)
-        debug_cmd = f"sudo bash {remote_temp_dir}/remote_install.sh"
-        debug_result = subprocess.run(ssh_cmd_tty + [debug_cmd], capture_output=True, text=True)
-        if debug_result.returncode != 0:
-            print("Debug output:")
-            print(debug_result.stderr)
+        # Execute remote installation with sudo
+        print_color("Executing remote installation...", GREEN)
         
-        # Cleanup on error
-        cleanup_cmd = f"sudo rm -rf {remote_temp_dir}"
-        _ = subprocess.run(ssh_cmd + [cleanup_cmd], capture_output=True)
-        sys.exit(1)
-    
-    # Final cleanup
-    print_color("Performing final cleanup...", GREEN)
-    cleanup_cmd = f"sudo rm -rf {remote_temp_dir}"
-    _ = subprocess.run(ssh_cmd_tty + [cleanup_cmd], capture_output=True)
-    
-    if is_update:
-        print_color("=== Remote Update Complete ===", BLUE)
-    else:
-        print_color("=== Remote Installation Complete ===", GREEN)
-    print_color(f"WireGuard Failover has been {'updated' if is_update else 'installed'} on {target_ip}", GREEN)
+        # Run the installation, feeding the sudo password over the channel's stdin
+        # so it is never written to a file on either host. The script travels as a
+        # bash -c argument rather than on stdin too: if sudo needs no password, the
+        # password line would otherwise be run as a command. The temp directory is
+        # removed in the same session whatever the outcome, keeping the exit code.
+        script = render_remote_install_script(remote_temp_dir, is_update)
+        remote_cmd = (f"sudo -S -p '' bash -c {shlex.quote(script)}; "
+                      f"rc=$?; rm -rf {remote_temp_dir}; exit $rc")
+        result = run_command(ssh_cmd + [remote_cmd], input=f"{sudo_password}\n",
+                             capture_output=True, text=True)
+        
+        # Output results
+        if result.returncode == 0:
+            if is_update:
+                print_color("✅ Remote update completed successfully", BLUE)
+            else:
+                print_color("✅ Remote installation completed successfully!", GREEN)
+            print(result.stdout)
+        else:
+            if is_update:
+                print_color(f"{prefix}❌ Error during remote update", RED)
+            else:
+                print_color(f"{prefix}❌ Error during remote installation", RED)
+            _print_host_output(prefix, result.stderr)
+            sys.exit(1)
+        
+        if is_update:
+            print_color("=== Remote Update Complete ===", BLUE)
+        else:
+            print_color("=== Remote Installation Complete ===", GREEN)
+        print_color(f"WireGuard Failover has been {'updated' if is_update else 'installed'} on {target_ip}", GREEN)
+        
+        # Show service status; a few properties answer "did it start?" without
+        # systemctl status rendering the unit tree and reading the journal
+        print_color(f"\nService status on {target_ip}:", YELLOW)
+        status_cmd = f"systemctl show -p {','.join(SERVICE_STATUS_PROPERTIES)} wg-failover.service"
+        result = run_command(ssh_cmd + [status_cmd], capture_output=True, text=True)
+        status = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+        color = GREEN if status.get('ActiveState') == 'active' else RED
+        for name in SERVICE_STATUS_PROPERTIES:
+            print_color(f"  {name}: {status.get(name, 'unknown')}", color)
+    finally:
+        # Close the master connection and remove its control socket
+        if master.poll() is None:
+            master.terminate()
+            _ = master.wait()
+        _ = run_command(["ssh", *ssh_opts, "-O", "exit", host],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        shutil.rmtree(control_dir, ignore_errors=True)
+        ssh_log.close()
+
+def remote_install_many(target_ips: list[str], private_key: str, username: str, sudo_password: str,
+                        is_update: bool) -> None:
+    """Perform remote installation or update on several servers concurrently"""
+    # Each target is network-bound and has its own master connection, so the
+    # whole deploy takes about as long as the slowest host. Prompts from several
+    # masters would interleave on the terminal, so they run in batch mode. Every
+    # worker runs its own multi-threaded zstd, so only a few run at once.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(target_ips), MAX_PARALLEL_DEPLOYS)) as executor:
+        futures = {ip: executor.submit(remote_install, ip, private_key, username, sudo_password, is_update,
+                                       batch_mode=True)
+                   for ip in target_ips}
+    failed = []
+    for ip, future in futures.items():
+        try:
+            future.result()
+        except SystemExit as e:
+            if e.code:
+                failed.append(ip)
+        except Exception as e:
+            print_color(f"Error on {ip}: {e}", RED)
+            failed.append(ip)
     
-    # Show service status
-    print_color("\nService status on remote server:", YELLOW)
-    status_cmd = "systemctl status wg-failover.service --no-pager"
-    _ = subprocess.run(ssh_cmd_tty + [status_cmd], capture_output=False)
+    print()
+    print_color(f"=== {len(target_ips) - len(failed)} of {len(target_ips)} servers {'updated' if is_update else 'installed'} ===",
+                RED if failed else GREEN)
+    if failed:
+        print_color(f"Failed: {', '.join(failed)}", RED)
+        sys.exit(1)
 
 def main() -> None:
     parser: argparse.ArgumentParser = argparse.ArgumentParser(description='WireGuard Failover Installer')
     _ = parser.add_argument('--remote', action='store_true', help='Install on remote server')
     _ = parser.add_argument('--local', action='store_true', help='Install locally (default)')
     _ = parser.add_argument('--update', action='store_true', help='Update existing installation')
-    _ = parser.add_argument('--target-ip', help='Target server IP for remote installation')
+    _ = parser.add_argument('--target-ip', help='Target server IP for remote installation (comma-separated for several)')
     _ = parser.add_argument('--private-key', help='Private key file for SSH authentication')
     _ = parser.add_argument('--username', help='Username for SSH connection (default: current user)')
     _ = parser.add_argument('--sudo-password', help='Sudo password for remote installation')
     
     args: argparse.Namespace = parser.parse_args()
     
-    # Get current directory
-    current_dir: str = os.path.dirname(os.path.realpath(__file__))
-    
     # Check if this is an update
-    is_update: bool = getattr(args, 'update', False)
+    is_update: bool = args.update
     
     # If no mode specified and already installed, suggest update
-    if not getattr(args, 'remote', False) and not getattr(args, 'local', False) and not getattr(args, 'update', False):
+    if not args.remote and not args.local and not args.update:
         if is_installed():
             print_color("WireGuard Failover is already installed.", GREEN)
             installed_version: str | None = get_installed_version()
@@ -735,25 +988,34 @@ def main() -> None:
                 sys.exit(0)
     
     # Handle remote installation/update
-    if getattr(args, 'remote', False):
-        if not getattr(args, 'target_ip', None) or not getattr(args, 'private_key', None):
+    if args.remote:
+        if not args.target_ip or not args.private_key:
             print_color("For remote installation, --target-ip and --private-key are required", RED)
             sys.exit(1)
         
+        # Duplicates would run two installs into the same staging directory at once
+        target_ips = list(dict.fromkeys(ip.strip() for ip in args.target_ip.split(',') if ip.strip()))
+        if not target_ips:
+            print_color("Error: --target-ip does not contain any address", RED)
+            sys.exit(1)
+        
         # Validate private key file exists
-        if not os.path.exists(getattr(args, 'private_key', '')):
-            print_color(f"Error: Private key file '{getattr(args, 'private_key', '')}' not found", RED)
+        if not os.path.exists(args.private_key):
+            print_color(f"Error: Private key file '{args.private_key}' not found", RED)
             sys.exit(1)
         
         # Get username if not provided
-        username: str = getattr(args, 'username', '') or getpass.getuser()
+        username: str = args.username or getpass.getuser()
         
         # Get sudo password if not provided
-        sudo_password: str = getattr(args, 'sudo_password', '')
+        sudo_password: str = args.sudo_password
         if not sudo_password:
             sudo_password = getpass.getpass("Enter sudo password for remote server: ")
         
-        remote_install(getattr(args, 'target_ip', ''), getattr(args, 'private_key', ''), username, sudo_password, is_update)
+        if len(target_ips) == 1:
+            remote_install(target_ips[0], args.private_key, username, sudo_password, is_update)
+        else:
+            remote_install_many(target_ips, args.private_key, username, sudo_password, is_update)
         return
     
     # Handle local installation/update
@@ -761,7 +1023,7 @@ def main() -> None:
     check_root()
     
     # Perform local installation or update
-    local_install(current_dir, is_update)
+    local_install(SCRIPT_DIR, is_update)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file